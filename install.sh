@@ -56,16 +56,16 @@ check_python() {
         PYTHON_VERSION=$(python3 --version | cut -d' ' -f2)
         print_success "Python $PYTHON_VERSION found"
         
-        # Check if version is 3.8+
+        # Check if version is 3.9+
         MAJOR=$(echo $PYTHON_VERSION | cut -d. -f1)
         MINOR=$(echo $PYTHON_VERSION | cut -d. -f2)
         
-        if [ "$MAJOR" -lt 3 ] || ([ "$MAJOR" -eq 3 ] && [ "$MINOR" -lt 8 ]); then
-            print_error "Python 3.8+ required (found $PYTHON_VERSION)"
+        if [ "$MAJOR" -lt 3 ] || ([ "$MAJOR" -eq 3 ] && [ "$MINOR" -lt 9 ]); then
+            print_error "Python 3.9+ required (found $PYTHON_VERSION)"
             exit 1
         fi
     else
-        print_error "Python 3 not found. Please install Python 3.8+"
+        print_error "Python 3 not found. Please install Python 3.9+"
         exit 1
     fi
 }
@@ -235,6 +235,7 @@ show_usage() {
     echo "  deps                 - Install Python dependencies only"
     echo "  download-voice NAME  - Download a specific voice model"
     echo "  download-all         - Download all voice models"
+    echo "  quantize             - Create int8 copies of downloaded voice models"
     echo "  systemd              - Create systemd service file"
     echo "  test                 - Test the installation"
     echo
@@ -321,6 +322,12 @@ case "${1:-install}" in
         done
         ;;
     
+    "quantize")
+        source venv/bin/activate
+        pip install onnx --quiet
+        python3 quantize.py
+        ;;
+    
     "systemd")
         setup_systemd
         ;;
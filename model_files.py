@@ -0,0 +1,13 @@
+"""
+Ruler Voice Bridge - Voice model file naming
+Shared by server.py and quantize.py without pulling in the web stack.
+"""
+
+from pathlib import Path
+
+def int8_model_name(filename):
+    """Name of the int8 model quantize.py writes for a voice model file, or None if it isn't .onnx"""
+    path = Path(filename)
+    if path.suffix != '.onnx':
+        return None
+    return path.with_suffix('.int8.onnx').name
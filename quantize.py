@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Ruler Voice Bridge - Voice Model Quantizer
+Converts Piper voice models to int8 with ONNX Runtime dynamic quantization.
+The quantized model is written next to the original as <name>.int8.onnx
+and is picked up by the server when "precision" is set to "int8".
+
+Usage: python quantize.py [--voice-dir DIR] [--include-conv] [model.onnx ...]
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from model_files import int8_model_name
+
+# Same lookup as server.py, without importing the web stack
+CONFIG_FILE = os.environ.get('RULER_VOICE_CONFIG', 'config.json')
+VOICE_DIR = os.environ.get('RULER_VOICE_DIR', str(Path.home() / '.piper' / 'voices'))
+
+def get_voice_dir():
+    """Return the voice directory the server loads from"""
+    voice_dir = VOICE_DIR
+    if Path(CONFIG_FILE).exists():
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                voice_dir = json.load(f).get("voice_dir", voice_dir)
+        except Exception as e:
+            print(f"Failed to read {CONFIG_FILE}: {e}, using {voice_dir}")
+    return Path(voice_dir).expanduser()
+
+def quantize_model(model_path, include_conv=False):
+    """Quantize one voice model and return the output path"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_path = model_path.with_name(int8_model_name(model_path.name))
+    op_types = ["MatMul", "Conv"] if include_conv else ["MatMul"]
+
+    quantize_dynamic(
+        str(model_path),
+        str(output_path),
+        op_types_to_quantize=op_types,
+        weight_type=QuantType.QInt8
+    )
+    return output_path
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Quantize Piper voice models to int8")
+    parser.add_argument("models", nargs="*", type=Path,
+                        help="Models to quantize (default: every fp32 model in the voice directory)")
+    parser.add_argument("--voice-dir", type=Path,
+                        help=f"Voice directory (default: voice_dir from {CONFIG_FILE}, or {VOICE_DIR})")
+    parser.add_argument("--include-conv", action="store_true",
+                        help="Also quantize Conv weights (smaller, but may cost audio quality)")
+    args = parser.parse_args()
+
+    try:
+        import onnx  # noqa: F401 - required by onnxruntime.quantization
+    except ImportError:
+        print("The onnx package is required for quantization. Please run: pip install onnx")
+        sys.exit(1)
+
+    voice_dir = args.voice_dir.expanduser() if args.voice_dir else get_voice_dir()
+    models = args.models or sorted(
+        path for path in voice_dir.glob("*.onnx") if not path.name.endswith(".int8.onnx")
+    )
+    if not models:
+        print(f"No voice models found in {voice_dir}")
+        sys.exit(1)
+
+    for model_path in models:
+        if int8_model_name(model_path.name) is None:
+            print(f"✗ Skipping {model_path.name}: not an .onnx model")
+            continue
+        print(f"Quantizing {model_path.name}...")
+        output_path = quantize_model(model_path, args.include_conv)
+        before = model_path.stat().st_size / 1e6
+        after = output_path.stat().st_size / 1e6
+        print(f"✓ {output_path.name} ({before:.1f} MB -> {after:.1f} MB)")
+
+    print()
+    print('Set "precision": "int8" in config.json to use the quantized models.')
+
+if __name__ == "__main__":
+    main()
@@ -9,14 +9,27 @@ Usage: python server.py
 
 import os
 import sys
+import asyncio
 import json
+import hashlib
+import importlib.util
+import shutil
+import struct
+import subprocess
+import queue
 import tempfile
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from contextlib import asynccontextmanager
 import uvicorn
 import logging
+from model_files import int8_model_name
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,10 +41,19 @@ DEFAULT_PORT = int(os.environ.get('RULER_VOICE_PORT', '9003'))
 DEFAULT_HOST = os.environ.get('RULER_VOICE_HOST', '0.0.0.0')
 DEFAULT_VOICE = os.environ.get('RULER_VOICE_DEFAULT', 'amy')
 VOICE_DIR = os.environ.get('RULER_VOICE_DIR', str(Path.home() / '.piper' / 'voices'))
+PLAYBACK_MARGIN = 30  # seconds a player may run past the audio it was given before it is killed
 
 # Global variables
 voices = {}
 config = {}
+audio_player = None
+synthesis_slots = None
+playback_lock = None  # one /play at a time so notifications don't talk over each other
+silence_pads = {}  # voice name -> precomputed silence padding PCM
+stream_headers = {}  # voice name -> precomputed RIFF header for streamed /speak responses
+audio_cache = OrderedDict()  # (voice, text digest, padding) -> WAV bytes
+audio_cache_bytes = 0
+in_flight = {}  # cache key -> SharedSynthesis still running
 
 def load_config():
     """Load configuration from file or use defaults"""
@@ -50,7 +72,17 @@ def load_config():
             "ryan": "en_US-ryan-medium.onnx"
         },
         "audio_backend": "auto",  # auto, paplay, aplay, sox, or ffplay
-        "silence_padding": 0.2  # seconds of silence to add
+        "silence_padding": 0.2,  # seconds of silence to add
+        "max_concurrency": None,  # simultaneous Piper syntheses, default cores / onnx_threads
+        "cache_size": 256,  # synthesized /speak responses kept in memory, 0 disables
+        "cache_bytes": 64 * 1024 * 1024,  # total audio held by the cache
+        "onnx_threads": None,  # intra-op threads per synthesis, default half the cores, 0 = all
+        "onnx_providers": "auto",  # auto, or a list such as ["CoreMLExecutionProvider", "CPUExecutionProvider"]
+        "precision": "fp32",  # fp32, or int8 to use models produced by quantize.py
+        "max_chars": 2000,  # longest text accepted by /speak and /play
+        # Server processes; each loads its own voices and cache. The /play lock is
+        # per process too, so with more than one, clips from different workers can overlap
+        "workers": 1
     }
     
     if Path(CONFIG_FILE).exists():
@@ -66,44 +98,71 @@ def load_config():
         config = default_config
         logger.info("Using default configuration")
     
+    cpus = os.cpu_count() or 1
+    onnx_threads = config.get("onnx_threads")
+    if onnx_threads is not None and onnx_threads < 0:
+        logger.warning(f"Invalid onnx_threads {onnx_threads}, using the automatic default")
+        onnx_threads = None
+    if onnx_threads is None:
+        onnx_threads = max(1, cpus // 2)
+    config["onnx_threads"] = onnx_threads
+    
+    # Keep concurrent syntheses x intra-op threads around the core count;
+    # 0 lets onnxruntime use every core
+    if not config.get("max_concurrency"):
+        config["max_concurrency"] = max(1, cpus // (onnx_threads or cpus))
+    
     return config
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Load models on startup"""
-    global voices, config
+    global voices, config, audio_player, synthesis_slots, playback_lock
     
     config = load_config()
+    audio_player = get_audio_player()
+    synthesis_slots = asyncio.Semaphore(config["max_concurrency"])
+    playback_lock = asyncio.Lock()
     
     try:
-        # Try to import piper
-        try:
-            from piper import PiperVoice
-        except ImportError:
+        # Check that piper is installed; load_voice imports it
+        if importlib.util.find_spec("piper") is None:
             logger.error("Piper not installed! Please run: pip install piper-tts")
             logger.error("Or use the install.sh script")
             sys.exit(1)
 
-        voice_dir = Path(config["voice_dir"])
+        voice_dir = Path(config["voice_dir"]).expanduser()
         voice_models = config["voice_models"]
         
         if not voice_dir.exists():
             logger.warning(f"Voice directory {voice_dir} does not exist, creating it...")
             voice_dir.mkdir(parents=True, exist_ok=True)
         
-        # Load available voices
-        for name, filename in voice_models.items():
-            voice_file = voice_dir / filename
-            if voice_file.exists():
-                logger.info(f"Loading {name} voice model...")
-                try:
-                    voices[name] = PiperVoice.load(str(voice_file))
-                    logger.info(f"✓ {name} loaded successfully!")
-                except Exception as e:
-                    logger.error(f"Failed to load {name}: {e}")
-            else:
-                logger.warning(f"Voice model not found: {voice_file}")
-                logger.info(f"Download it with: ./install.sh download-voice {name}")
+        # Find available voices
+        voice_files = {}
+        for name, model in voice_models.items():
+            voice_file = resolve_voice_file(voice_dir, name, model, config["precision"])
+            if voice_file:
+                voice_files[name] = voice_file
+
+        # Load them in parallel; model parsing is mostly I/O and native code
+        if voice_files:
+            workers = min(len(voice_files), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {}
+                for name, voice_file in voice_files.items():
+                    logger.info(f"Loading {name} voice model...")
+                    futures[name] = executor.submit(load_voice, *voice_file)
+
+                for name, future in futures.items():
+                    try:
+                        voices[name] = future.result()
+                        sample_rate = voices[name].config.sample_rate
+                        silence_pads[name] = make_silence(sample_rate, config["silence_padding"])
+                        stream_headers[name] = wav_header(sample_rate)
+                        logger.info(f"✓ {name} loaded successfully!")
+                    except Exception as e:
+                        logger.error(f"Failed to load {name}: {e}")
 
         if not voices:
             logger.error("No voice models loaded! Please install at least one voice model.")
@@ -119,6 +178,75 @@ async def lifespan(app: FastAPI):
 
     logger.info("TTS Server shutting down...")
 
+def resolve_voice_file(voice_dir, name, model, precision):
+    """Return (model_path, config_path) for a voice, or None if it isn't installed
+
+    A model entry is either a filename or a {"fp32": ..., "int8": ...} mapping.
+    The voice config JSON always comes from the fp32 model.
+    """
+    if isinstance(model, dict):
+        fp32_file = voice_dir / model["fp32"]
+        int8_file = voice_dir / model["int8"] if "int8" in model else None
+    else:
+        fp32_file = voice_dir / model
+        int8_name = int8_model_name(model)
+        int8_file = voice_dir / int8_name if int8_name else None
+
+    config_file = Path(f"{fp32_file}.json")
+
+    if precision == "int8" and int8_file and int8_file.exists():
+        return int8_file, config_file
+
+    if fp32_file.exists():
+        if precision == "int8":
+            logger.warning(f"No int8 model for {name}, using {fp32_file.name}")
+            logger.info("Create one with: python quantize.py")
+        return fp32_file, config_file
+
+    logger.warning(f"Voice model not found: {fp32_file}")
+    logger.info(f"Download it with: ./install.sh download-voice {name}")
+    return None
+
+def get_onnx_providers():
+    """Pick onnxruntime execution providers, preferring CUDA when available"""
+    import onnxruntime
+
+    providers = config.get("onnx_providers", "auto")
+    if providers != "auto":
+        return providers
+
+    if "CUDAExecutionProvider" in onnxruntime.get_available_providers():
+        logger.info("onnxruntime-gpu detected, using CUDA (set onnx_providers to override)")
+        # Same options as PiperVoice.load(use_cuda=True); an exhaustive cuDNN
+        # search would rerun for every new input length
+        return [
+            ("CUDAExecutionProvider", {"cudnn_conv_algo_search": "HEURISTIC"}),
+            "CPUExecutionProvider"
+        ]
+    return ["CPUExecutionProvider"]
+
+def load_voice(model_path, config_path=None):
+    """Load a Piper voice with tuned onnxruntime session options"""
+    import onnxruntime
+    from piper import PiperVoice
+    from piper.config import PiperConfig
+
+    with open(config_path or f"{model_path}.json", 'r') as f:
+        voice_config = PiperConfig.from_dict(json.load(f))
+
+    sess_options = onnxruntime.SessionOptions()
+    sess_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    sess_options.intra_op_num_threads = config["onnx_threads"]
+    sess_options.enable_mem_pattern = True
+    sess_options.add_session_config_entry("session.dynamic_block_base", "4")
+
+    session = onnxruntime.InferenceSession(
+        str(model_path),
+        sess_options=sess_options,
+        providers=get_onnx_providers()
+    )
+    return PiperVoice(session=session, config=voice_config)
+
 app = FastAPI(
     title="Ruler Voice Bridge",
     description="TTS API for AI Coding Assistants",
@@ -166,46 +294,107 @@ def get_audio_player():
         return backend
     
     # Try to detect available audio players
-    import subprocess
-    
     players = ["paplay", "aplay", "sox", "ffplay", "afplay"]  # afplay for macOS
     
     for player in players:
-        try:
-            result = subprocess.run(["which", player], capture_output=True)
-            if result.returncode == 0:
-                logger.info(f"Using audio backend: {player}")
-                return player
-        except:
-            continue
+        if shutil.which(player):
+            logger.info(f"Using audio backend: {player}")
+            return player
     
     logger.warning("No audio player found! Install pulseaudio-utils, alsa-utils, sox, or ffmpeg")
     return None
 
-def play_audio_file(file_path):
-    """Play audio file using the best available method"""
-    player = get_audio_player()
-    
-    if not player:
-        raise Exception("No audio player available")
-    
-    import subprocess
-    
-    # Build the command based on the player
+def wav_header(sample_rate, sample_width=2, channels=1, data_size=None):
+    """Build a RIFF header, sized for a WAV stream of unknown length by default"""
+    byte_rate = sample_rate * sample_width * channels
+    block_align = sample_width * channels
+    riff_size = 0xFFFFFFFF if data_size is None else 36 + data_size
+    data_size = 0xFFFFFFFF if data_size is None else data_size
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', riff_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, byte_rate, block_align, sample_width * 8,
+        b'data', data_size
+    )
+
+def make_silence(sample_rate, duration):
+    """Return mono 16-bit PCM silence of the given duration in seconds"""
+    if duration <= 0:
+        return b''
+    return bytes(int(sample_rate * duration) * 2)
+
+def cache_key(voice_name, text, silence_duration):
+    """Key a synthesized response by voice, text and padding"""
+    digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+    return (voice_name, digest, silence_duration)
+
+def cache_get(key):
+    """Return cached WAV bytes for key, or None"""
+    audio = audio_cache.get(key)
+    if audio is not None:
+        audio_cache.move_to_end(key)
+    return audio
+
+def cache_put(key, audio):
+    """Store WAV bytes, evicting the least recently used entries"""
+    global audio_cache_bytes
+    max_size = config.get("cache_size", 256)
+    max_bytes = config.get("cache_bytes", 64 * 1024 * 1024)
+    # Long one-off prompts would only push out the short repeated ones worth caching
+    if max_size <= 0 or len(audio) > max_bytes // 16:
+        return
+    if key in audio_cache:
+        audio_cache_bytes -= len(audio_cache[key])
+    audio_cache[key] = audio
+    audio_cache_bytes += len(audio)
+    audio_cache.move_to_end(key)
+    while len(audio_cache) > max_size or audio_cache_bytes > max_bytes:
+        _, evicted = audio_cache.popitem(last=False)
+        audio_cache_bytes -= len(evicted)
+
+def player_stream_command(player, sample_rate):
+    """Build a command that plays raw mono 16-bit PCM from stdin, if the player can"""
+    rate = str(sample_rate)
     if player == "paplay":
-        cmd = ["paplay", file_path]
+        return ["paplay", "--raw", f"--rate={rate}", "--format=s16le", "--channels=1"]
     elif player == "aplay":
-        cmd = ["aplay", "-q", file_path]
+        return ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", rate, "-c", "1", "-"]
     elif player == "sox":
-        cmd = ["play", "-q", file_path]
+        return ["play", "-q", "-t", "raw", "-r", rate, "-e", "signed", "-b", "16", "-c", "1", "-"]
     elif player == "ffplay":
-        cmd = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", file_path]
-    elif player == "afplay":  # macOS
-        cmd = ["afplay", file_path]
-    else:
-        cmd = [player, file_path]
-    
-    result = subprocess.run(cmd, capture_output=True, timeout=30)
+        return ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet",
+                "-f", "s16le", "-ar", rate, "-ac", "1", "-"]
+    return None
+
+def play_speech_file(voice, text, silence_buffer, on_synthesized=None):
+    """Synthesize text to a temporary WAV and play it, for players that can't read stdin"""
+    # afplay (macOS) and custom players need a file on disk
+    # Write straight into the mkstemp descriptor instead of reopening the path
+    fd, temp_path = tempfile.mkstemp(suffix='.wav')
+    try:
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                write_speech_wav(temp_file, voice, text, silence_buffer)
+        finally:
+            if on_synthesized:
+                on_synthesized()
+        
+        duration = os.path.getsize(temp_path) / (voice.config.sample_rate * 2)
+        
+        # Players only print progress on stdout; keep stderr for error reporting
+        try:
+            result = subprocess.run(
+                [audio_player, temp_path], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                timeout=duration + PLAYBACK_MARGIN
+            )
+        except subprocess.TimeoutExpired:
+            raise Exception("Audio playback timed out")
+    finally:
+        # Remove the file even when synthesis fails or the player times out
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
     
     if result.returncode != 0:
         error_msg = result.stderr.decode() if result.stderr else "Unknown error"
@@ -213,13 +402,188 @@ def play_audio_file(file_path):
     
     return True
 
+def play_speech(voice, text, silence_buffer, on_synthesized=None):
+    """Synthesize text and play it, feeding each sentence to the player as it is ready
+
+    on_synthesized is called as soon as Piper is done, before playback finishes.
+    """
+    if not audio_player:
+        raise Exception("No audio player available")
+    
+    cmd = player_stream_command(audio_player, voice.config.sample_rate)
+    if cmd is None:
+        return play_speech_file(voice, text, silence_buffer, on_synthesized)
+    
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    bytes_per_second = voice.config.sample_rate * 2
+    pcm_queue = queue.Queue()
+    timed_out = threading.Event()
+    
+    def kill_player():
+        timed_out.set()
+        proc.kill()
+    
+    def write_to_player():
+        # Runs in its own thread so Piper never waits for the player to drain the pipe
+        queued = 0.0  # seconds of audio handed to the player so far
+        try:
+            while True:
+                pcm = pcm_queue.get()
+                if pcm is None:
+                    return
+                queued += len(pcm) / bytes_per_second
+                # A stalled player stops reading and the write blocks once the pipe is full;
+                # a healthy one never holds us up longer than the audio it has been given
+                timer = threading.Timer(queued + PLAYBACK_MARGIN, kill_player)
+                timer.start()
+                try:
+                    proc.stdin.write(pcm)
+                    proc.stdin.flush()
+                finally:
+                    timer.cancel()
+        except BrokenPipeError:
+            # Player exited early; its stderr explains why
+            pass
+    
+    writer = threading.Thread(target=write_to_player, daemon=True)
+    writer.start()
+    total = 0.0  # seconds of audio synthesized
+    
+    try:
+        try:
+            if silence_buffer:
+                pcm_queue.put(silence_buffer)
+                total += len(silence_buffer) / bytes_per_second
+            for chunk in voice.synthesize(text):
+                if not writer.is_alive():
+                    break  # player is gone, no point synthesizing the rest
+                pcm = chunk.audio_int16_bytes
+                pcm_queue.put(pcm)
+                total += len(pcm) / bytes_per_second
+        finally:
+            pcm_queue.put(None)
+            if on_synthesized:
+                on_synthesized()
+        # Every write is bounded by its timer, so the writer always finishes
+        writer.join()
+        _, stderr = proc.communicate(timeout=total + PLAYBACK_MARGIN)
+    except subprocess.TimeoutExpired:
+        timed_out.set()
+        proc.kill()
+        proc.wait()
+    except:
+        proc.kill()
+        writer.join()
+        proc.wait()
+        raise
+    
+    if timed_out.is_set():
+        raise Exception("Audio playback timed out")
+    
+    if proc.returncode != 0:
+        error_msg = stderr.decode() if stderr else "Unknown error"
+        raise Exception(f"Audio playback failed: {error_msg}")
+    
+    return True
+
+def write_speech_wav(file, voice, text, silence_buffer):
+    """Synthesize text as WAV into an open binary file, prefixed with silence padding"""
+    with wave.open(file, 'wb') as wav_file:
+        # Mono 16-bit PCM at the voice's rate, as Piper always produces
+        wav_file.setparams((1, 2, voice.config.sample_rate, 0, 'NONE', 'not compressed'))
+        # writeframesraw skips the per-call header seek/patch; close() fixes the sizes once
+        if silence_buffer:
+            wav_file.writeframesraw(silence_buffer)
+        for chunk in voice.synthesize(text):
+            wav_file.writeframesraw(chunk.audio_int16_bytes)
+
+def validate_text(text):
+    """Reject empty or oversized text before it reaches Piper"""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Text is empty")
+    
+    max_chars = config.get("max_chars", 2000)
+    if len(text) > max_chars:
+        raise HTTPException(status_code=413, detail=f"Text exceeds {max_chars} characters")
+
+class SharedSynthesis:
+    """A /speak synthesis whose audio can be streamed to every request for the same text
+
+    Synthesis runs in its own task, so it finishes and fills the cache even if
+    the client that started it disconnects.
+    """
+
+    def __init__(self, key, voice, text, silence_buffer):
+        self.key = key
+        self.voice = voice
+        self.text = text
+        self.silence_buffer = silence_buffer
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Condition()
+        in_flight[key] = self
+        self.task = asyncio.create_task(self.run())
+
+    def synthesize_chunks(self):
+        for chunk in self.voice.synthesize(self.text):
+            yield chunk.audio_int16_bytes
+
+    async def run(self):
+        try:
+            # Piper's generator is blocking, so pull each sentence in a worker thread
+            async with synthesis_slots:
+                async for pcm in iterate_in_threadpool(self.synthesize_chunks()):
+                    async with self.changed:
+                        self.chunks.append(pcm)
+                        self.changed.notify_all()
+
+            # Cache a complete WAV with real sizes in the header, copying the audio once
+            data_size = len(self.silence_buffer) + sum(len(pcm) for pcm in self.chunks)
+            header = wav_header(self.voice.config.sample_rate, data_size=data_size)
+            cache_put(self.key, b''.join([header, self.silence_buffer, *self.chunks]))
+        except Exception as e:
+            logger.error(f"TTS generation failed: {e}")
+            self.error = e
+        finally:
+            in_flight.pop(self.key, None)
+            async with self.changed:
+                self.done = True
+                self.changed.notify_all()
+
+    async def first_chunk(self):
+        """Wait until the first sentence is ready, raising if synthesis failed before it"""
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.chunks or self.done)
+        if not self.chunks and self.error:
+            raise self.error
+
+    async def follow(self):
+        """Yield PCM chunks as they are synthesized, from the first sentence on"""
+        sent = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: sent < len(self.chunks) or self.done)
+                pending = self.chunks[sent:]
+                finished = self.done
+
+            for pcm in pending:
+                yield pcm
+            sent += len(pending)
+
+            if finished:
+                if self.error:
+                    raise self.error
+                return
+
 @app.get("/speak")
 async def speak_text(
     text: str = Query(..., description="Text to convert to speech"),
     voice: str = Query(default=None, description="Voice to use")
 ):
-    """Generate speech and return audio file"""
+    """Generate speech and stream it back as a WAV file"""
     voice_name = voice or config.get("default_voice", DEFAULT_VOICE)
+    validate_text(text)
     
     if not voices:
         raise HTTPException(status_code=503, detail="No voice models loaded")
@@ -229,61 +593,49 @@ async def speak_text(
         raise HTTPException(status_code=400, detail=f"Voice '{voice_name}' not available. Choose from: {available}")
     
     selected_voice = voices[voice_name]
+    headers = {'Content-Disposition': 'attachment; filename="speech.wav"'}
 
-    try:
-        # Create temporary WAV file
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-            temp_path = temp_file.name
+    # Silence padding goes out right after the header
+    silence_duration = config.get("silence_padding", 0.2)
+    silence_buffer = silence_pads[voice_name]
 
-        # Generate speech with optional silence padding
-        import wave
-        
-        # Generate speech
-        temp_speech_path = temp_path + ".speech"
-        with wave.open(temp_speech_path, 'wb') as wav_file:
-            selected_voice.synthesize_wav(text, wav_file)
-        
-        # Read the generated speech
-        with wave.open(temp_speech_path, 'rb') as speech_wav:
-            params = speech_wav.getparams()
-            frames = speech_wav.readframes(params.nframes)
-        
-        # Add silence padding if configured
-        silence_duration = config.get("silence_padding", 0.2)
-        if silence_duration > 0:
-            sample_rate = params.framerate
-            silence_samples = int(sample_rate * silence_duration)
-            silence_buffer = b'\x00' * (silence_samples * params.sampwidth * params.nchannels)
-            frames = silence_buffer + frames
-        
-        # Write final audio
-        with wave.open(temp_path, 'wb') as wav_file:
-            wav_file.setparams(params)
-            wav_file.writeframes(frames)
-        
-        # Clean up
-        try:
-            os.unlink(temp_speech_path)
-        except:
-            pass
+    # Repeated prompts are served from memory without running Piper
+    key = cache_key(voice_name, text, silence_duration)
+    cached = cache_get(key)
+    if cached is not None:
+        return Response(content=cached, media_type='audio/wav', headers=headers)
 
-        return FileResponse(
-            temp_path,
-            media_type='audio/wav',
-            filename='speech.wav'
-        )
+    # Identical requests arriving while this text is still synthesizing share one Piper run
+    synthesis = in_flight.get(key)
+    if synthesis is None:
+        synthesis = SharedSynthesis(key, selected_voice, text, silence_buffer)
 
+    # Fail with a proper HTTP error while no headers have been sent yet;
+    # only errors in later sentences can cut the stream short
+    try:
+        await synthesis.first_chunk()
     except Exception as e:
-        logger.error(f"TTS generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"TTS generation failed: {str(e)}")
 
-@app.get("/play")
+    stream_header = stream_headers[voice_name]
+
+    async def stream_audio():
+        yield stream_header
+        if silence_buffer:
+            yield silence_buffer
+        async for pcm in synthesis.follow():
+            yield pcm
+
+    return StreamingResponse(stream_audio(), media_type='audio/wav', headers=headers)
+
+@app.get("/play", status_code=204)
 async def play_text(
     text: str = Query(..., description="Text to speak and play locally"),
     voice: str = Query(default=None, description="Voice to use")
 ):
     """Generate speech and play it locally"""
     voice_name = voice or config.get("default_voice", DEFAULT_VOICE)
+    validate_text(text)
     
     if not voices:
         raise HTTPException(status_code=503, detail="No voice models loaded")
@@ -294,53 +646,31 @@ async def play_text(
     
     selected_voice = voices[voice_name]
 
+    loop = asyncio.get_running_loop()
+    slot_held = False
+    
+    def release_slot():
+        # Called from the worker thread once Piper is done, so the next request
+        # can synthesize while this one is still playing
+        nonlocal slot_held
+        if slot_held:
+            slot_held = False
+            loop.call_soon_threadsafe(synthesis_slots.release)
+    
     try:
-        # Create temporary WAV file
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-            temp_path = temp_file.name
-
-        # Generate speech with optional silence padding
-        import wave
-        
-        # Generate speech
-        temp_speech_path = temp_path + ".speech"
-        with wave.open(temp_speech_path, 'wb') as wav_file:
-            selected_voice.synthesize_wav(text, wav_file)
-        
-        # Read the generated speech
-        with wave.open(temp_speech_path, 'rb') as speech_wav:
-            params = speech_wav.getparams()
-            frames = speech_wav.readframes(params.nframes)
-        
-        # Add silence padding if configured
-        silence_duration = config.get("silence_padding", 0.2)
-        if silence_duration > 0:
-            sample_rate = params.framerate
-            silence_samples = int(sample_rate * silence_duration)
-            silence_buffer = b'\x00' * (silence_samples * params.sampwidth * params.nchannels)
-            frames = silence_buffer + frames
-        
-        # Write final audio
-        with wave.open(temp_path, 'wb') as wav_file:
-            wav_file.setparams(params)
-            wav_file.writeframes(frames)
-        
-        # Clean up temp speech file
-        try:
-            os.unlink(temp_speech_path)
-        except:
-            pass
-
-        # Play the audio
-        play_audio_file(temp_path)
-
-        # Clean up
-        try:
-            os.unlink(temp_path)
-        except:
-            pass
-
-        return {"status": "played", "text": text, "voice": voice_name}
+        # Queue behind any clip still playing, then take a synthesis slot
+        async with playback_lock:
+            await synthesis_slots.acquire()
+            slot_held = True
+            try:
+                # Playback starts as soon as the first sentence is synthesized
+                await asyncio.to_thread(
+                    play_speech, selected_voice, text, silence_pads[voice_name], release_slot
+                )
+            finally:
+                release_slot()
+
+        return Response(status_code=204)
 
     except Exception as e:
         logger.error(f"Playback failed: {e}")
@@ -358,10 +688,15 @@ def main():
     print(f"   say 'Hello world'  # Using the CLI tool")
     print()
 
+    workers = config["workers"]
+    logger.info(f"Starting {workers} worker(s)")
+
     uvicorn.run(
-        app, 
+        # Multiple workers must import the app themselves
+        "server:app" if workers > 1 else app,
         host=config["host"], 
         port=config["port"],
+        workers=workers,
         log_level="info"
     )
 